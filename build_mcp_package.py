@@ -3,11 +3,25 @@
 Build script for RTX Remix Toolkit MCP Server package
 """
 
+import os
 import subprocess
 import sys
 import shutil
+import stat
+from importlib.util import find_spec
 from pathlib import Path
 
+# Directories the cleanup never descends into; they hold the SDK,
+# packman dependencies and environments rather than our own caches
+PRUNED_DIRS = frozenset({
+    ".git",
+    "_build",
+    "_compiler",
+    "_repo",
+    ".venv",
+    "node_modules",
+})
+
 
 def run_command(cmd, cwd=None, check=True):
     """Run a command and return the result."""
@@ -23,28 +37,37 @@ def run_command(cmd, cwd=None, check=True):
     return result
 
 
+def _is_link(path):
+    """Check for a symlink or a Windows directory junction."""
+    if os.path.islink(path):
+        return True
+    attributes = getattr(os.lstat(path), "st_file_attributes", 0)
+    return bool(attributes & getattr(stat, "FILE_ATTRIBUTE_REPARSE_POINT", 0))
+
+
 def clean_build_artifacts():
     """Clean previous build artifacts."""
     print("🧹 Cleaning previous build artifacts...")
     
-    paths_to_clean = [
-        "build",
-        "dist", 
-        "*.egg-info",
-        "__pycache__",
-        ".pytest_cache",
-        ".mypy_cache"
-    ]
-    
-    for path_pattern in paths_to_clean:
-        for path in Path(".").glob(path_pattern):
-            if path.exists():
-                if path.is_dir():
-                    shutil.rmtree(path)
-                    print(f"  Removed directory: {path}")
-                else:
-                    path.unlink()
-                    print(f"  Removed file: {path}")
+    # Caches are removed anywhere in the tree, build outputs only at the root
+    cache_dirs = {"__pycache__", ".pytest_cache", ".mypy_cache"}
+    root_artifact_dirs = {"build", "dist"}
+    root_artifact_suffixes = (".egg-info",)
+    
+    for root, dirs, _files in os.walk("."):
+        at_root = root == "."
+        for name in list(dirs):
+            path = os.path.normpath(os.path.join(root, name))
+            # os.walk follows junctions on Windows before 3.12, so check
+            # for links here rather than relying on followlinks=False
+            if name in PRUNED_DIRS or _is_link(path):
+                dirs.remove(name)
+            elif name in cache_dirs or (
+                at_root and (name in root_artifact_dirs or name.endswith(root_artifact_suffixes))
+            ):
+                shutil.rmtree(path)
+                print(f"  Removed directory: {path}")
+                dirs.remove(name)
 
 
 def check_dependencies():
@@ -53,13 +76,21 @@ def check_dependencies():
     
     required_packages = ["build", "wheel", "setuptools"]
     
+    missing = []
     for package in required_packages:
-        try:
-            __import__(package)
+        if find_spec(package) is not None:
             print(f"  ✅ {package} is available")
-        except ImportError:
-            print(f"  📦 Installing {package}...")
-            run_command([sys.executable, "-m", "pip", "install", package])
+        else:
+            missing.append(package)
+    
+    # Install everything that is missing with a single pip run
+    if missing:
+        print(f"  📦 Installing {', '.join(missing)}...")
+        run_command([
+            sys.executable, "-m", "pip", "install",
+            "--disable-pip-version-check", "--no-input",
+            *missing
+        ])
 
 
 def validate_package_files():
@@ -75,9 +106,13 @@ def validate_package_files():
         "MANIFEST.in"
     ]
     
+    # All required files live at the top level, so one directory read suffices
+    with os.scandir(".") as it:
+        present = {entry.name for entry in it}
+    
     missing_files = []
     for file in required_files:
-        if not Path(file).exists():
+        if file not in present:
             missing_files.append(file)
         else:
             print(f"  ✅ {file}")
@@ -7,16 +7,35 @@ features in the RTX Remix Toolkit repository.
 """
 
 import asyncio
+import collections
+import copy
+import functools
+import hashlib
 import json
 import os
+import signal
 import subprocess
 import sys
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
+
 from mcp.server.fastmcp import FastMCP
 from mcp.types import TextContent, EmbeddedResource
 
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 
 # Initialize MCP server
 mcp = FastMCP("RTX Remix Toolkit Developer")
@@ -27,11 +46,250 @@ EXTENSIONS_ROOT = REPO_ROOT / "source" / "extensions"
 APPS_ROOT = REPO_ROOT / "source" / "apps"
 DOCS_ROOT = REPO_ROOT / "docs"
 
+# Lines of stdout/stderr kept from long-running scripts
+OUTPUT_TAIL_LINES = 10000
+
+# Bytes read from a script's output per chunk, and the longest line kept
+STREAM_CHUNK_BYTES = 64 * 1024
+MAX_LINE_BYTES = 1024 * 1024
+
+# Threads used to read extension metadata concurrently
+METADATA_WORKERS = 32
+
+# Name prefixes and the category each one maps to
+CATEGORY_PREFIXES = (
+    ("lightspeed.", "lightspeed"),
+    ("omni.flux.", "flux"),
+    ("omni.kit.", "kit"),
+)
+
+# Directories never descended into when listing an extension's Python files
+PRUNED_DIRS = frozenset({
+    "__pycache__",
+    ".git",
+    "_build",
+    "node_modules",
+    ".venv",
+    ".mypy_cache",
+    ".pytest_cache",
+})
+
+# Successful build keys, used to skip rebuilding an unchanged tree
+BUILD_CACHE_FILE = Path.home() / ".cache" / "rtx-remix-mcp" / "build_cache.json"
+
+# Most recent build keys kept in BUILD_CACHE_FILE
+BUILD_CACHE_MAX_ENTRIES = 256
+
+# Build output and caches that search_code never needs to look at
+SEARCH_EXCLUDE_GLOBS = (
+    "!_build/**",
+    "!dist/**",
+    "!build/**",
+    "!.git/**",
+    "!**/__pycache__/**",
+)
+
+
+def _classify(name: str) -> str:
+    """Map an extension or dependency name to its category by prefix."""
+    for prefix, category in CATEGORY_PREFIXES:
+        if name.startswith(prefix):
+            return category
+    return "other"
+
+
+def _scandir_files(root: str):
+    """Recursively yield the paths of Python files under root."""
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in PRUNED_DIRS:
+                        yield from _scandir_files(entry.path)
+                elif entry.name.endswith(".py") and entry.is_file():
+                    yield entry.path
+    except PermissionError:
+        pass
 
-@mcp.resource("repo://structure")
-def get_repo_structure() -> str:
-    """Get the high-level repository structure and architecture overview."""
-    return """
+
+@functools.lru_cache(maxsize=2048)
+def _load_toml_cached(path_str: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Parse a TOML file; the mtime and size arguments only key the cache."""
+    with open(path_str, "rb") as f:
+        return tomllib.load(f)
+
+
+def _load_toml(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Load a TOML file, reusing the parsed result while the file is unchanged.
+    
+    Callers get their own copy, since the parsed dicts end up in tool
+    results that clients are free to modify.
+    """
+    st = os.stat(path)
+    return copy.deepcopy(_load_toml_cached(str(path), st.st_mtime_ns, st.st_size))
+
+
+async def _drain(stream: asyncio.StreamReader, ring: collections.deque) -> None:
+    """
+    Read a subprocess stream into a bounded buffer of lines.
+    
+    The stream is read in fixed-size chunks rather than with readline,
+    which drops lines longer than the StreamReader limit; lines longer
+    than MAX_LINE_BYTES are truncated instead.
+    """
+    line = b""
+    while True:
+        chunk = await stream.read(STREAM_CHUNK_BYTES)
+        if not chunk:
+            break
+        pieces = chunk.split(b"\n")
+        for i, piece in enumerate(pieces):
+            if len(line) < MAX_LINE_BYTES:
+                line += piece[:MAX_LINE_BYTES - len(line)]
+            if i < len(pieces) - 1:
+                ring.append(line.decode(errors="replace") + "\n")
+                line = b""
+    if line:
+        ring.append(line.decode(errors="replace"))
+
+
+def _kill_process_tree(proc: asyncio.subprocess.Process) -> None:
+    """Kill a script started by _run_script_streamed and anything it spawned."""
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def _run_script_streamed(cmd: List[str], cwd: Path, timeout: float) -> Dict[str, Any]:
+    """
+    Run a script without buffering its whole output in memory.
+    
+    Only the last OUTPUT_TAIL_LINES lines of stdout and stderr are kept.
+    The process is killed and asyncio.TimeoutError raised if it runs
+    longer than timeout seconds, and it is killed as well if the calling
+    request is cancelled.
+    """
+    # A session of its own lets the whole process group be killed, so
+    # children of the script don't outlive it
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=os.name == "posix"
+    )
+    stdout = collections.deque(maxlen=OUTPUT_TAIL_LINES)
+    stderr = collections.deque(maxlen=OUTPUT_TAIL_LINES)
+    
+    waiter = asyncio.gather(_drain(proc.stdout, stdout), _drain(proc.stderr, stderr), proc.wait())
+    try:
+        await asyncio.wait_for(waiter, timeout)
+    finally:
+        if proc.returncode is None:
+            _kill_process_tree(proc)
+            await proc.wait()
+        # Retrieve the readers' outcome so nothing is left unreported
+        await asyncio.gather(waiter, return_exceptions=True)
+    
+    return {
+        "success": proc.returncode == 0,
+        "returncode": proc.returncode,
+        "stdout": "".join(stdout),
+        "stderr": "".join(stderr),
+    }
+
+
+# Locks serializing the scripts that work on the checkout, one per event loop
+_CHECKOUT_LOCKS = weakref.WeakKeyDictionary()
+
+
+def _checkout_lock() -> asyncio.Lock:
+    """
+    Return the lock held while a build, test, format or lint script runs.
+    
+    These scripts share _build/ and the source files, so only one runs at
+    a time; other tools keep being served meanwhile. The lock is created
+    lazily per loop, since on Python 3.8 a Lock binds to the loop current
+    at creation.
+    """
+    loop = asyncio.get_running_loop()
+    lock = _CHECKOUT_LOCKS.get(loop)
+    if lock is None:
+        lock = _CHECKOUT_LOCKS[loop] = asyncio.Lock()
+    return lock
+
+
+def _build_cache_key(flag: str) -> Optional[str]:
+    """
+    Hash the state of the checkout together with the build flag.
+    
+    Combines the committed tree id with the contents of modified and
+    untracked files, so build scripts, premake and packman files count as
+    well as source/. _build/ is left out. Returns None when no key can be
+    computed, e.g. outside a git checkout.
+    """
+    def git(*args: str) -> bytes:
+        return subprocess.run(
+            ["git", *args],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            check=True,
+            timeout=30
+        ).stdout
+    
+    def paths(*args: str) -> List[bytes]:
+        # -z keeps git from quoting non-ASCII and unusual names
+        return [name for name in git(*args, "-z", "--", ".", ":(exclude)_build").split(b"\0") if name]
+    
+    try:
+        digest = hashlib.sha256(flag.encode())
+        digest.update(git("rev-parse", "HEAD^{tree}"))
+        changed = paths("diff", "--name-only", "HEAD")
+        changed += paths("ls-files", "--others", "--exclude-standard")
+        for name in sorted(changed):
+            digest.update(name + b"\0")
+            try:
+                digest.update((REPO_ROOT / os.fsdecode(name)).read_bytes())
+            except OSError:
+                digest.update(b"<deleted>")
+        return digest.hexdigest()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _build_cache_hit(key: str, marker: Path) -> bool:
+    """Check whether key was built successfully and is what _build/ holds."""
+    try:
+        cache = json.loads(BUILD_CACHE_FILE.read_text(encoding="utf-8"))
+        return key in cache and marker.read_text(encoding="utf-8").strip() == key
+    except (OSError, ValueError):
+        return False
+
+
+def _record_build(key: str, marker: Path) -> None:
+    """Remember a successful build of key."""
+    try:
+        try:
+            cache = json.loads(BUILD_CACHE_FILE.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            cache = {}
+        cache[key] = {"returncode": 0, "ts": time.time()}
+        if len(cache) > BUILD_CACHE_MAX_ENTRIES:
+            newest = sorted(cache.items(), key=lambda item: item[1].get("ts", 0), reverse=True)
+            cache = dict(newest[:BUILD_CACHE_MAX_ENTRIES])
+        BUILD_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        BUILD_CACHE_FILE.write_text(json.dumps(cache), encoding="utf-8")
+        marker.write_text(key, encoding="utf-8")
+    except OSError:
+        pass
+
+
+REPO_STRUCTURE = """
 # RTX Remix Toolkit Repository Structure
 
 ## Key Directories:
@@ -58,11 +316,7 @@ def get_repo_structure() -> str:
 - Omniverse Kit SDK foundation
 """
 
-
-@mcp.resource("repo://build_commands")
-def get_build_commands() -> str:
-    """Get available build and development commands."""
-    return """
+BUILD_COMMANDS = """
 # RTX Remix Toolkit Build Commands
 
 ## Core Commands:
@@ -87,6 +341,49 @@ def get_build_commands() -> str:
 """
 
 
+@mcp.resource("repo://structure")
+def get_repo_structure() -> str:
+    """Get the high-level repository structure and architecture overview."""
+    return REPO_STRUCTURE
+
+
+@mcp.resource("repo://build_commands")
+def get_build_commands() -> str:
+    """Get available build and development commands."""
+    return BUILD_COMMANDS
+
+
+def _load_extension_metadata(ext_path: str) -> Dict[str, Any]:
+    """Collect the list_extensions entry for a single extension directory."""
+    ext_name = os.path.basename(ext_path)
+    
+    # One directory read answers the config/tests/docs presence checks
+    try:
+        with os.scandir(ext_path) as inner:
+            dirnames = {child.name for child in inner if child.is_dir()}
+    except OSError:
+        dirnames = set()
+    
+    # Read extension.toml for metadata
+    metadata = {}
+    if "config" in dirnames:
+        try:
+            config = _load_toml(os.path.join(ext_path, "config", "extension.toml"))
+            metadata = config.get("package", {})
+        except Exception:
+            pass
+    
+    return {
+        "name": ext_name,
+        "path": ext_path,
+        "category": "lightspeed" if _classify(ext_name) == "lightspeed" else "flux",
+        "description": metadata.get("description", ""),
+        "version": metadata.get("version", ""),
+        "has_tests": "tests" in dirnames,
+        "has_docs": "docs" in dirnames,
+    }
+
+
 @mcp.tool()
 def list_extensions(category: Optional[str] = None) -> List[Dict[str, Any]]:
     """
@@ -100,40 +397,24 @@ def list_extensions(category: Optional[str] = None) -> List[Dict[str, Any]]:
     if not EXTENSIONS_ROOT.exists():
         return extensions
     
-    for ext_dir in EXTENSIONS_ROOT.iterdir():
-        if not ext_dir.is_dir():
-            continue
-            
-        ext_name = ext_dir.name
-        
-        # Filter by category if specified
-        if category:
-            if category.lower() == "lightspeed" and not ext_name.startswith("lightspeed"):
+    # Filter by category if specified
+    wanted = category.lower() if category else None
+    if wanted not in ("lightspeed", "flux"):
+        wanted = None
+    
+    ext_paths = []
+    with os.scandir(EXTENSIONS_ROOT) as it:
+        for entry in it:
+            if not entry.is_dir(follow_symlinks=False):
                 continue
-            if category.lower() == "flux" and not ext_name.startswith("omni.flux"):
+            if wanted and _classify(entry.name) != wanted:
                 continue
-        
-        # Read extension.toml for metadata
-        config_path = ext_dir / "config" / "extension.toml"
-        metadata = {}
-        if config_path.exists():
-            try:
-                import tomllib
-                with open(config_path, "rb") as f:
-                    config = tomllib.load(f)
-                    metadata = config.get("package", {})
-            except Exception:
-                pass
-        
-        extensions.append({
-            "name": ext_name,
-            "path": str(ext_dir),
-            "category": "lightspeed" if ext_name.startswith("lightspeed") else "flux",
-            "description": metadata.get("description", ""),
-            "version": metadata.get("version", ""),
-            "has_tests": (ext_dir / "tests").exists(),
-            "has_docs": (ext_dir / "docs").exists(),
-        })
+            ext_paths.append(entry.path)
+    
+    # Metadata reads are I/O-bound, so overlap them across threads
+    ext_paths.sort()
+    with ThreadPoolExecutor(max_workers=METADATA_WORKERS) as executor:
+        extensions = list(executor.map(_load_extension_metadata, ext_paths))
     
     return extensions
 
@@ -154,7 +435,7 @@ def analyze_extension(extension_name: str) -> Dict[str, Any]:
     analysis = {
         "name": extension_name,
         "path": str(ext_path),
-        "category": "lightspeed" if extension_name.startswith("lightspeed") else "flux",
+        "category": "lightspeed" if _classify(extension_name) == "lightspeed" else "flux",
         "structure": {},
         "dependencies": [],
         "metadata": {},
@@ -175,30 +456,31 @@ def analyze_extension(extension_name: str) -> Dict[str, Any]:
     config_path = ext_path / "config" / "extension.toml"
     if config_path.exists():
         try:
-            import tomllib
-            with open(config_path, "rb") as f:
-                config = tomllib.load(f)
-                analysis["metadata"] = config.get("package", {})
-                analysis["dependencies"] = list(config.get("dependencies", {}).keys())
+            config = _load_toml(config_path)
+            analysis["metadata"] = config.get("package", {})
+            analysis["dependencies"] = list(config.get("dependencies", {}).keys())
         except Exception as e:
             analysis["config_error"] = str(e)
     
+    # List Python files in one walk, picking out the ones under tests/
+    python_files = []
+    test_files = []
+    ext_root = str(ext_path)
+    prefix_len = len(ext_root) + 1
+    tests_prefix = "tests" + os.sep
+    for py_file in _scandir_files(ext_root):
+        rel_path = py_file[prefix_len:]
+        if rel_path.startswith(tests_prefix):
+            test_files.append(rel_path[len(tests_prefix):].replace(os.sep, "/"))
+        python_files.append(rel_path.replace(os.sep, "/"))
+    analysis["files"] = python_files
+    
     # Analyze tests
-    tests_path = ext_path / "tests"
-    if tests_path.exists():
-        test_info = {"has_tests": True, "test_files": []}
-        for test_file in tests_path.rglob("*.py"):
-            test_info["test_files"].append(str(test_file.relative_to(tests_path)))
-        analysis["tests"] = test_info
+    if "tests" in structure:
+        analysis["tests"] = {"has_tests": True, "test_files": test_files}
     else:
         analysis["tests"] = {"has_tests": False}
     
-    # List Python files
-    python_files = []
-    for py_file in ext_path.rglob("*.py"):
-        python_files.append(str(py_file.relative_to(ext_path)))
-    analysis["files"] = python_files
-    
     return analysis
 
 
@@ -234,19 +516,23 @@ def create_extension_template(
         return {"error": f"Extension '{extension_name}' already exists"}
     
     try:
-        # Create directory structure
-        ext_path.mkdir(parents=True)
-        (ext_path / "config").mkdir()
-        (ext_path / "data").mkdir()
-        (ext_path / "docs").mkdir()
-        
-        # Create namespace directories
+        # Collect namespace directories; the deepest one holds extension.py
         namespace_parts = extension_name.split(".")
-        code_path = ext_path
+        namespace_dirs = []
+        module_path = ext_path
         for part in namespace_parts:
-            code_path = code_path / part
-            code_path.mkdir(exist_ok=True)
-            (code_path / "__init__.py").touch()
+            module_path = module_path / part
+            namespace_dirs.append(module_path)
+        
+        # Create directory structure; makedirs fills in the parents
+        dirs = [ext_path / "config", ext_path / "data", ext_path / "docs", module_path]
+        if include_tests:
+            dirs += [ext_path / "tests" / "unit", ext_path / "tests" / "e2e"]
+        for d in dirs:
+            os.makedirs(d, exist_ok=True)
+        
+        # Files are collected as (path, content) and written in one pass
+        files = [(d / "__init__.py", "") for d in namespace_dirs]
         
         # Create extension.toml
         toml_content = f'''[package]
@@ -279,14 +565,9 @@ dependencies = [
 ]
 '''
         
-        with open(ext_path / "config" / "extension.toml", "w") as f:
-            f.write(toml_content)
+        files.append((ext_path / "config" / "extension.toml", toml_content))
         
         # Create extension.py
-        module_path = ext_path / namespace_parts[0]
-        for part in namespace_parts[1:]:
-            module_path = module_path / part
-        
         extension_py_content = f'''"""
 {extension_name} extension
 """
@@ -323,15 +604,10 @@ class {extension_name.replace(".", "_").title()}Extension(omni.ext.IExt):
         pass
 '''
         
-        with open(module_path / "extension.py", "w") as f:
-            f.write(extension_py_content)
+        files.append((module_path / "extension.py", extension_py_content))
         
         # Create test structure if requested
         if include_tests:
-            (ext_path / "tests").mkdir()
-            (ext_path / "tests" / "unit").mkdir()
-            (ext_path / "tests" / "e2e").mkdir()
-            
             # Create basic test file
             test_content = f'''"""
 Unit tests for {extension_name}
@@ -361,8 +637,7 @@ class Test{extension_name.replace(".", "_").title()}(unittest.TestCase):
 if __name__ == "__main__":
     unittest.main()
 '''
-            with open(ext_path / "tests" / "unit" / "test_extension.py", "w") as f:
-                f.write(test_content)
+            files.append((ext_path / "tests" / "unit" / "test_extension.py", test_content))
         
         # Create basic documentation
         readme_content = f'''# {extension_name}
@@ -392,8 +667,7 @@ This extension provides...
 ```
 '''
         
-        with open(ext_path / "docs" / "README.md", "w") as f:
-            f.write(readme_content)
+        files.append((ext_path / "docs" / "README.md", readme_content))
         
         # Create changelog
         changelog_content = f'''# Changelog
@@ -406,8 +680,7 @@ All notable changes to {extension_name} will be documented in this file.
 - Initial extension creation
 '''
         
-        with open(ext_path / "docs" / "CHANGELOG.md", "w") as f:
-            f.write(changelog_content)
+        files.append((ext_path / "docs" / "CHANGELOG.md", changelog_content))
         
         # Create premake5.lua
         premake_content = f'''-- {extension_name} premake5.lua
@@ -417,8 +690,10 @@ local ext = get_current_extension_info()
 project_ext(ext)
 '''
         
-        with open(ext_path / "premake5.lua", "w") as f:
-            f.write(premake_content)
+        files.append((ext_path / "premake5.lua", premake_content))
+        
+        for path, content in files:
+            path.write_text(content, encoding="utf-8")
         
         return {
             "success": True,
@@ -438,41 +713,59 @@ project_ext(ext)
 
 
 @mcp.tool()
-def run_build(config: str = "release") -> Dict[str, Any]:
+async def run_build(config: str = "release", force: bool = False) -> Dict[str, Any]:
     """
     Run the build system.
     
+    The build is skipped when the checkout is unchanged since the last
+    successful build of the same configuration.
+    
     Args:
         config: Build configuration ('release' or 'debug')
+        force: Run the build even if a cached result matches
     """
     try:
         build_script = REPO_ROOT / "build.sh"
         flag = "-r" if config == "release" else "-d"
+        command = f"./build.sh {flag}"
         
-        result = subprocess.run(
-            [str(build_script), flag],
-            cwd=REPO_ROOT,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
-        )
+        # Check the cache, build and record under one lock so concurrent
+        # calls neither overlap nor interleave their cache updates
+        async with _checkout_lock():
+            # Hashing runs git and reads modified files, so keep it off the event loop
+            loop = asyncio.get_running_loop()
+            cache_key = await loop.run_in_executor(None, _build_cache_key, flag)
+            marker = REPO_ROOT / "_build" / f".cache_key{flag}"
+            if cache_key and not force and _build_cache_hit(cache_key, marker):
+                return {
+                    "success": True,
+                    "returncode": 0,
+                    "stdout": "",
+                    "stderr": "",
+                    "command": command,
+                    "cached": True
+                }
+            
+            result = await _run_script_streamed(
+                [str(build_script), flag],
+                cwd=REPO_ROOT,
+                timeout=300  # 5 minute timeout
+            )
+            result["command"] = command
+            
+            if cache_key and result["success"]:
+                _record_build(cache_key, marker)
         
-        return {
-            "success": result.returncode == 0,
-            "returncode": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "command": f"./build.sh {flag}"
-        }
+        return result
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return {"error": "Build timed out after 5 minutes"}
     except Exception as e:
         return {"error": f"Build failed: {str(e)}"}
 
 
 @mcp.tool()
-def run_tests(extension_name: Optional[str] = None, test_type: str = "all") -> Dict[str, Any]:
+async def run_tests(extension_name: Optional[str] = None, test_type: str = "all") -> Dict[str, Any]:
     """
     Run tests for the repository or specific extension.
     
@@ -495,84 +788,80 @@ def run_tests(extension_name: Optional[str] = None, test_type: str = "all") -> D
             repo_script = REPO_ROOT / "repo.sh"
             cmd = [str(repo_script), "test"]
         
-        result = subprocess.run(
-            cmd,
-            cwd=REPO_ROOT,
-            capture_output=True,
-            text=True,
-            timeout=600  # 10 minute timeout for tests
-        )
-        
-        return {
-            "success": result.returncode == 0,
-            "returncode": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "command": " ".join(cmd)
-        }
+        async with _checkout_lock():
+            result = await _run_script_streamed(
+                cmd,
+                cwd=REPO_ROOT,
+                timeout=600  # 10 minute timeout for tests
+            )
+        result["command"] = " ".join(cmd)
+        return result
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return {"error": "Tests timed out after 10 minutes"}
     except Exception as e:
         return {"error": f"Test execution failed: {str(e)}"}
 
 
 @mcp.tool()
-def format_code() -> Dict[str, Any]:
+async def format_code() -> Dict[str, Any]:
     """Format code using the project's formatting tools."""
     try:
         format_script = REPO_ROOT / "format_code.sh"
         
-        result = subprocess.run(
-            [str(format_script)],
-            cwd=REPO_ROOT,
-            capture_output=True,
-            text=True,
-            timeout=120  # 2 minute timeout
-        )
+        async with _checkout_lock():
+            result = await _run_script_streamed(
+                [str(format_script)],
+                cwd=REPO_ROOT,
+                timeout=120  # 2 minute timeout
+            )
+        result["command"] = "./format_code.sh"
+        return result
         
-        return {
-            "success": result.returncode == 0,
-            "returncode": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "command": "./format_code.sh"
-        }
-        
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return {"error": "Code formatting timed out after 2 minutes"}
     except Exception as e:
         return {"error": f"Code formatting failed: {str(e)}"}
 
 
 @mcp.tool()
-def lint_code() -> Dict[str, Any]:
+async def lint_code() -> Dict[str, Any]:
     """Lint code using the project's linting tools."""
     try:
         lint_script = REPO_ROOT / "lint_code.sh"
         
-        result = subprocess.run(
-            [str(lint_script)],
-            cwd=REPO_ROOT,
-            capture_output=True,
-            text=True,
-            timeout=120  # 2 minute timeout
-        )
+        async with _checkout_lock():
+            result = await _run_script_streamed(
+                [str(lint_script)],
+                cwd=REPO_ROOT,
+                timeout=120  # 2 minute timeout
+            )
+        result["command"] = "./lint_code.sh"
+        return result
         
-        return {
-            "success": result.returncode == 0,
-            "returncode": result.returncode,
-            "stdout": result.stdout,
-            "stderr": result.stderr,
-            "command": "./lint_code.sh"
-        }
-        
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         return {"error": "Code linting timed out after 2 minutes"}
     except Exception as e:
         return {"error": f"Code linting failed: {str(e)}"}
 
 
+@mcp.tool()
+async def run_preflight() -> Dict[str, Any]:
+    """
+    Format code, then lint the formatted result.
+    
+    Lint runs after formatting finishes, since format_code.sh rewrites the
+    files lint_code.sh reads.
+    """
+    fmt = await format_code()
+    lint = await lint_code()
+    return {
+        "success": fmt.get("success", False) and lint.get("success", False),
+        "format": fmt,
+        "lint": lint
+    }
+
+
 @mcp.tool()
 def search_code(query: str, file_pattern: str = "*.py") -> List[Dict[str, Any]]:
     """
@@ -583,38 +872,62 @@ def search_code(query: str, file_pattern: str = "*.py") -> List[Dict[str, Any]]:
         file_pattern: File pattern to search in (default: *.py)
     """
     try:
-        import subprocess
+        # Use ripgrep for fast searching, consuming its JSON events as they arrive
+        rg_args = ["rg", "--json", "--no-messages"]
+        if file_pattern == "*.py":
+            rg_args.extend(["--type", "py"])
+        else:
+            rg_args.extend(["-g", file_pattern])
+        for exclude in SEARCH_EXCLUDE_GLOBS:
+            rg_args.extend(["-g", exclude])
+        cpu_count = os.cpu_count()
+        if cpu_count:
+            rg_args.extend(["--threads", str(cpu_count)])
+        rg_args.extend(["-e", query])
         
-        # Use ripgrep for fast searching
-        result = subprocess.run(
-            ["rg", "--json", "--type", "py" if file_pattern == "*.py" else "all", query],
+        proc = subprocess.Popen(
+            rg_args,
             cwd=REPO_ROOT,
-            capture_output=True,
-            text=True,
-            timeout=30
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
         )
         
+        timed_out = threading.Event()
+        
+        def _kill():
+            timed_out.set()
+            proc.kill()
+        
+        timer = threading.Timer(30, _kill)
+        timer.start()
+        
         matches = []
-        for line in result.stdout.strip().split('\n'):
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-                if data.get("type") == "match":
+        try:
+            for raw in proc.stdout:
+                # Skip begin/end/summary events without decoding them
+                if not raw.startswith(b'{"type":"match"'):
+                    continue
+                try:
+                    data = json_loads(raw)["data"]
                     matches.append({
-                        "file": data["data"]["path"]["text"],
-                        "line": data["data"]["line_number"],
-                        "column": data["data"]["submatches"][0]["start"],
-                        "content": data["data"]["lines"]["text"],
-                        "match": data["data"]["submatches"][0]["match"]["text"]
+                        "file": data["path"]["text"],
+                        "line": data["line_number"],
+                        "column": data["submatches"][0]["start"],
+                        "content": data["lines"]["text"],
+                        "match": data["submatches"][0]["match"]["text"]
                     })
-            except (json.JSONDecodeError, KeyError):
-                continue
+                except (ValueError, KeyError):
+                    continue
+            proc.wait()
+        finally:
+            timer.cancel()
+            proc.stdout.close()
+        
+        if timed_out.is_set():
+            return [{"error": "Search timed out after 30 seconds"}]
         
         return matches
         
-    except subprocess.TimeoutExpired:
-        return [{"error": "Search timed out after 30 seconds"}]
     except Exception as e:
         return [{"error": f"Search failed: {str(e)}"}]
 
@@ -638,21 +951,21 @@ def get_extension_dependencies(extension_name: str) -> Dict[str, Any]:
         return {"error": f"No extension.toml found for '{extension_name}'"}
     
     try:
-        import tomllib
-        with open(config_path, "rb") as f:
-            config = tomllib.load(f)
+        config = _load_toml(config_path)
         
         dependencies = config.get("dependencies", {})
         
-        # Analyze dependency types
+        # Analyze dependency types in a single pass
+        buckets = {"lightspeed": [], "flux": [], "kit": [], "other": []}
+        for dep in dependencies:
+            buckets[_classify(dep)].append(dep)
+        
         dep_analysis = {
-            "direct_dependencies": list(dependencies.keys()),
-            "lightspeed_deps": [dep for dep in dependencies.keys() if dep.startswith("lightspeed.")],
-            "flux_deps": [dep for dep in dependencies.keys() if dep.startswith("omni.flux.")],
-            "kit_deps": [dep for dep in dependencies.keys() if dep.startswith("omni.kit.")],
-            "other_deps": [dep for dep in dependencies.keys() if not any(
-                dep.startswith(prefix) for prefix in ["lightspeed.", "omni.flux.", "omni.kit."]
-            )],
+            "direct_dependencies": list(dependencies),
+            "lightspeed_deps": buckets["lightspeed"],
+            "flux_deps": buckets["flux"],
+            "kit_deps": buckets["kit"],
+            "other_deps": buckets["other"],
             "total_count": len(dependencies)
         }
         
@@ -669,7 +982,6 @@ def get_extension_dependencies(extension_name: str) -> Dict[str, Any]:
 def main():
     """Main entry point for the MCP server."""
     import argparse
-    import sys
     
     parser = argparse.ArgumentParser(
         description="RTX Remix Toolkit MCP Server",
@@ -3,54 +3,219 @@
 Test script for RTX Remix Toolkit MCP Server package
 """
 
-import subprocess
+import collections
+import functools
+import glob
+import hashlib
+import json
+import os
+import shutil
 import sys
-import tempfile
-import venv
+from importlib.util import find_spec
 from pathlib import Path
 
+# Lines of command output kept for failure reports
+OUTPUT_TAIL_LINES = 200
 
-def run_command(cmd, cwd=None, check=True):
-    """Run a command and return the result."""
+# Echo command output as it arrives (set by --verbose)
+VERBOSE = False
+
+# Files that determine the contents of the built distributions
+PACKAGE_INPUTS = (
+    "pyproject.toml",
+    "setup.py",
+    "MANIFEST.in",
+    "mcp_server.py",
+    "README-MCP.md",
+    "README.md",
+    "setup.cfg",
+    "LICENSE",
+    "CHANGELOG.md",
+    "requirements-mcp.txt",
+)
+
+# Trees MANIFEST.in pulls into the source distribution
+PACKAGE_INPUT_GLOBS = ("tests/**/*.py",)
+
+# Built distributions, keyed by a hash of PACKAGE_INPUTS and PACKAGE_INPUT_GLOBS
+WHEEL_CACHE_DIR = Path.home() / ".cache" / "mcp-wheels"
+
+# Hashes of the checkout files a cached sdist contains, stored beside it
+SDIST_SOURCES_FILE = "sdist-sources.json"
+
+# Seed and test virtual environments, kept per user so no one else can plant them
+VENV_CACHE_DIR = Path.home() / ".cache" / "mcp-venvs"
+
+# Packages the harness itself needs in the running interpreter
+BUILD_REQUIREMENTS = ("build",)
+
+# Skip pip's self-update check and any interactive prompts
+PIP_INSTALL_FLAGS = ("--disable-pip-version-check", "--no-input")
+
+# Marks a seed venv whose ensurepip bootstrap completed
+SEED_READY_MARKER = ".mcp-seed-ready"
+
+
+def run_checked(cmd, cwd=None):
+    """Run a command that only needs to succeed, keeping the tail of its output for errors."""
+    import subprocess
+    
     print(f"Running: {' '.join(cmd)}")
-    result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
+    tail = collections.deque(maxlen=OUTPUT_TAIL_LINES)
+    with subprocess.Popen(
+        cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
+    ) as proc:
+        for line in proc.stdout:
+            tail.append(line)
+            if VERBOSE:
+                print(line, end="")
     
-    if check and result.returncode != 0:
-        print(f"Command failed with return code {result.returncode}")
-        print(f"STDOUT: {result.stdout}")
-        print(f"STDERR: {result.stderr}")
-        sys.exit(1)
+    if proc.returncode != 0:
+        print(f"Command failed with return code {proc.returncode}")
+        print(f"OUTPUT: {''.join(tail)}")
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output="".join(tail))
+
+
+def run_capture(cmd, cwd=None, check=True):
+    """Run a command whose output is inspected and return the result."""
+    import subprocess
     
-    return result
+    print(f"Running: {' '.join(cmd)}")
+    try:
+        return subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, check=check)
+    except subprocess.CalledProcessError as e:
+        print(f"STDOUT: {e.stdout}")
+        print(f"STDERR: {e.stderr}")
+        raise
+
+
+@functools.lru_cache(maxsize=None)
+def _seed_venv():
+    """Return a pip-enabled venv for this interpreter, creating it on first use."""
+    import venv
+    
+    # One seed per interpreter, so seeds of other Pythons are left alone
+    seed_path = VENV_CACHE_DIR / f"seed-{_interpreter_key()}"
+    
+    if not (seed_path / SEED_READY_MARKER).exists():
+        shutil.rmtree(seed_path, ignore_errors=True)
+        VENV_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        print(f"Creating seed virtual environment at {seed_path}")
+        venv.create(seed_path, with_pip=True, symlinks=sys.platform != "win32")
+        (seed_path / SEED_READY_MARKER).touch()
+    
+    return seed_path
+
+
+def _interpreter_key():
+    """Identify the running interpreter for naming cached venvs."""
+    return hashlib.sha256((sys.executable + sys.version).encode()).hexdigest()[:12]
+
+
+def _prune_cached_venvs(prefix, keep):
+    """Remove every cached venv named prefix-* except keep."""
+    for path in VENV_CACHE_DIR.glob(f"{prefix}-*"):
+        if path != keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _package_inputs_hash():
+    """Hash every file that ends up in the built distributions."""
+    digest = hashlib.sha256()
+    matched = sorted(
+        Path(path).as_posix() for pattern in PACKAGE_INPUT_GLOBS for path in glob.glob(pattern, recursive=True)
+    )
+    for name in (*PACKAGE_INPUTS, *matched):
+        digest.update(name.encode() + b"\0")
+        try:
+            digest.update(Path(name).read_bytes())
+        except FileNotFoundError:
+            digest.update(b"<missing>")
+    return digest.hexdigest()[:16]
+
+
+def _sdist_sources(tar_file):
+    """Hash the checkout files packed into an sdist, skipping generated metadata."""
+    import tarfile
+    
+    sources = {}
+    with tarfile.open(tar_file) as tar:
+        for member in tar.getmembers():
+            name = member.name.partition("/")[2]
+            if not member.isfile() or name == "PKG-INFO" or name.split("/")[0].endswith(".egg-info"):
+                continue
+            path = Path(name)
+            if path.is_file():
+                sources[name] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return sources
+
+
+def _cached_sources_match(cache_dir):
+    """Check that every file in a cached sdist is unchanged in the checkout."""
+    try:
+        recorded = json.loads((cache_dir / SDIST_SOURCES_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    for name, digest in recorded.items():
+        try:
+            if hashlib.sha256(Path(name).read_bytes()).hexdigest() != digest:
+                return False
+        except OSError:
+            return False
+    return True
 
 
 def test_package_build():
     """Test building the package."""
+    import tempfile
+    
     print("📦 Testing package build...")
     
     # Clean previous builds
-    for path in ["build", "dist", "*.egg-info"]:
-        run_command(["rm", "-rf", path], check=False)
+    for path in ["build", "dist", *glob.glob("*.egg-info")]:
+        shutil.rmtree(path, ignore_errors=True)
+    
+    dist_path = Path("dist")
+    cache_dir = WHEEL_CACHE_DIR / _package_inputs_hash()
     
-    # Build the package
-    run_command([sys.executable, "-m", "build"])
+    # The key only covers the files known to feed the build, so also check
+    # everything the cached sdist actually shipped
+    if cache_dir.is_dir() and not _cached_sources_match(cache_dir):
+        print(f"Cached build in {cache_dir} is stale, rebuilding")
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    
+    if cache_dir.is_dir():
+        # Unchanged inputs, so reuse the distributions built last time
+        print(f"Reusing cached build from {cache_dir}")
+        shutil.copytree(cache_dir, dist_path, ignore=shutil.ignore_patterns(SDIST_SOURCES_FILE))
+    else:
+        # Build the package
+        run_checked([sys.executable, "-m", "build"])
     
     # Check that dist files were created
-    dist_path = Path("dist")
     if not dist_path.exists():
-        print("❌ dist/ directory not created")
-        sys.exit(1)
+        raise RuntimeError("dist/ directory not created")
     
     wheel_files = list(dist_path.glob("*.whl"))
     tar_files = list(dist_path.glob("*.tar.gz"))
     
     if not wheel_files:
-        print("❌ No wheel file created")
-        sys.exit(1)
+        raise RuntimeError("No wheel file created")
     
     if not tar_files:
-        print("❌ No source distribution created")
-        sys.exit(1)
+        raise RuntimeError("No source distribution created")
+    
+    if not cache_dir.is_dir():
+        # Stage the copy and rename it so the cache never holds a partial build
+        WHEEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=WHEEL_CACHE_DIR))
+        for dist_file in (wheel_files[0], tar_files[0]):
+            shutil.copy2(dist_file, staging)
+        (staging / SDIST_SOURCES_FILE).write_text(json.dumps(_sdist_sources(tar_files[0])), encoding="utf-8")
+        try:
+            os.replace(staging, cache_dir)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
     
     print(f"✅ Package built successfully:")
     print(f"   Wheel: {wheel_files[0].name}")
@@ -61,115 +226,176 @@ def test_package_build():
 
 def test_package_install(wheel_file):
     """Test installing the package in a virtual environment."""
+    import sysconfig
+    from concurrent.futures import ThreadPoolExecutor
+    
     print("🔧 Testing package installation...")
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        venv_path = Path(temp_dir) / "test_venv"
+    # The venv is keyed by interpreter and wheel contents, so an unchanged
+    # wheel reuses the environment from a previous run. Only venvs of this
+    # interpreter are pruned, so alternating Pythons keep their own
+    prefix = f"test-{_interpreter_key()}"
+    wheel_key = hashlib.sha256(wheel_file.read_bytes()).hexdigest()[:16]
+    venv_path = VENV_CACHE_DIR / f"{prefix}-{wheel_key}"
+    ready_marker = venv_path / ".mcp-test-ready"
+    
+    # Get python executable
+    if sys.platform == "win32":
+        python_exe = venv_path / "Scripts" / "python.exe"
+    else:
+        python_exe = venv_path / "bin" / "python"
+    
+    if ready_marker.exists():
+        print(f"Reusing virtual environment at {venv_path}")
+    else:
+        # Discard any environment left behind by an interrupted or failed
+        # run, along with those built for older wheels
+        shutil.rmtree(venv_path, ignore_errors=True)
+        _prune_cached_venvs(prefix, venv_path)
+        VENV_CACHE_DIR.mkdir(parents=True, exist_ok=True)
         
-        # Create virtual environment
+        # Create virtual environment, with uv when available since it
+        # skips the ensurepip bootstrap; otherwise copy a pip-seeded venv
+        uv = shutil.which("uv")
         print(f"Creating virtual environment at {venv_path}")
-        venv.create(venv_path, with_pip=True)
-        
-        # Get python executable
-        if sys.platform == "win32":
-            python_exe = venv_path / "Scripts" / "python.exe"
-            pip_exe = venv_path / "Scripts" / "pip.exe"
+        if uv:
+            run_checked([uv, "venv", "--python", sys.executable, str(venv_path)])
         else:
-            python_exe = venv_path / "bin" / "python"
-            pip_exe = venv_path / "bin" / "pip"
+            shutil.copytree(
+                _seed_venv(), venv_path, symlinks=True, ignore=shutil.ignore_patterns(SEED_READY_MARKER)
+            )
         
         # Install the package
         print(f"Installing package from {wheel_file}")
-        run_command([str(pip_exe), "install", str(wheel_file)])
-        
-        # Test import
-        print("Testing import...")
-        result = run_command([str(python_exe), "-c", "import mcp_server; print('Import successful')"])
-        if "Import successful" not in result.stdout:
-            print("❌ Import test failed")
-            sys.exit(1)
+        if uv:
+            run_checked([uv, "pip", "install", "--python", str(python_exe), str(wheel_file)])
+        else:
+            # The copied pip script still points at the seed interpreter
+            run_checked([str(python_exe), "-m", "pip", "install", *PIP_INSTALL_FLAGS, str(wheel_file)])
+    
+    # Test import, reading the installed entry points in the same interpreter.
+    # -I keeps the source checkout off sys.path so the installed copy is
+    # imported; -S skips site.py and only the venv's site-packages is added.
+    print("Testing import...")
+    # Use the venv layout, not this interpreter's default scheme, which is
+    # posix_local (<venv>/local/...) on Debian and Ubuntu system Pythons
+    if sys.version_info >= (3, 11):
+        scheme = "venv"
+    else:
+        scheme = "nt" if sys.platform == "win32" else "posix_prefix"
+    site_packages = sysconfig.get_path(
+        "purelib", scheme, vars={"base": str(venv_path), "platbase": str(venv_path)}
+    )
+    probe = (
+        f"import site; site.addsitedir({site_packages!r}); "
+        "import importlib.metadata, mcp_server; "
+        "dist = importlib.metadata.distribution('rtx-remix-toolkit-mcp'); "
+        "print('Import successful'); "
+        "print('\\n'.join(f'{ep.name}={ep.value}' for ep in dist.entry_points))"
+    )
+    
+    # The probe and the --version run are independent child interpreters,
+    # so start both and wait; threads suffice as the work is in the children
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        import_probe = executor.submit(run_capture, [str(python_exe), "-I", "-S", "-c", probe])
+        # Every entry point runs mcp_server:main, so call it directly once
+        version_run = executor.submit(
+            run_capture, [str(python_exe), "-I", "-m", "mcp_server", "--version"], check=False
+        )
+        result = import_probe.result()
+        version_result = version_run.result()
+    
+    if "Import successful" not in result.stdout:
+        raise RuntimeError("Import test failed")
+    targets = dict(line.split("=", 1) for line in result.stdout.splitlines() if "=" in line)
+    
+    # Test entry points
+    print("Testing entry points...")
+    for entry_point in ["rtx-remix-mcp", "remix-mcp"]:
+        if sys.platform == "win32":
+            cmd_path = venv_path / "Scripts" / f"{entry_point}.exe"
+        else:
+            cmd_path = venv_path / "bin" / entry_point
         
-        # Test entry points
-        print("Testing entry points...")
-        for entry_point in ["rtx-remix-mcp", "remix-mcp"]:
-            if sys.platform == "win32":
-                cmd_path = venv_path / "Scripts" / f"{entry_point}.exe"
-            else:
-                cmd_path = venv_path / "bin" / entry_point
-            
-            if not cmd_path.exists():
-                print(f"❌ Entry point {entry_point} not found at {cmd_path}")
-                sys.exit(1)
-            
-            # Test --version flag
-            result = run_command([str(cmd_path), "--version"], check=False)
-            if result.returncode != 0:
-                print(f"❌ Entry point {entry_point} --version failed")
-                print(f"STDERR: {result.stderr}")
-                sys.exit(1)
-            
-            if "RTX Remix Toolkit MCP Server" not in result.stdout:
-                print(f"❌ Entry point {entry_point} version output incorrect")
-                print(f"Output: {result.stdout}")
-                sys.exit(1)
+        if not cmd_path.exists():
+            raise RuntimeError(f"Entry point {entry_point} not found at {cmd_path}")
         
-        print("✅ Package installation test passed")
+        if targets.get(entry_point) != "mcp_server:main":
+            raise RuntimeError(f"Entry point {entry_point} does not dispatch to mcp_server:main")
+    
+    if version_result.returncode != 0:
+        print(f"STDERR: {version_result.stderr}")
+        raise RuntimeError("mcp_server --version failed")
+    
+    if "RTX Remix Toolkit MCP Server" not in version_result.stdout:
+        print(f"Output: {version_result.stdout}")
+        raise RuntimeError("mcp_server --version output incorrect")
+    
+    # Only a venv that passed every check is reused by later runs
+    ready_marker.touch()
+    
+    print("✅ Package installation test passed")
 
 
 def test_mcp_functionality():
     """Test basic MCP server functionality."""
+    import asyncio
+    
     print("🔍 Testing MCP server functionality...")
     
-    # Create a minimal test to verify the server can start
-    test_script = """
-import sys
-sys.path.insert(0, '.')
-import mcp_server
-
-# Test that main resources and tools are available
-mcp = mcp_server.mcp
-
-# Check resources
-resources = [resource.name for resource in mcp.list_resources()]
-expected_resources = ["repo://structure", "repo://build_commands"]
-
-for expected in expected_resources:
-    if expected not in resources:
-        print(f"Missing resource: {expected}")
-        sys.exit(1)
-
-# Check tools
-tools = [tool.name for tool in mcp.list_tools()]
-expected_tools = [
-    "list_extensions",
-    "analyze_extension", 
-    "create_extension_template",
-    "run_build",
-    "run_tests",
-    "format_code",
-    "lint_code",
-    "search_code",
-    "get_extension_dependencies"
-]
-
-for expected in expected_tools:
-    if expected not in tools:
-        print(f"Missing tool: {expected}")
-        sys.exit(1)
-
-print("MCP server functionality test passed")
-"""
+    # The source tree is importable from here, so inspect the server in-process
+    sys.path.insert(0, ".")
+    import mcp_server
     
-    result = run_command([sys.executable, "-c", test_script])
-    if "MCP server functionality test passed" not in result.stdout:
-        print("❌ MCP functionality test failed")
-        sys.exit(1)
+    # Test that main resources and tools are available
+    mcp = mcp_server.mcp
+    
+    # Check resources
+    resource_uris = {str(resource.uri) for resource in asyncio.run(mcp.list_resources())}
+    expected_resources = {"repo://structure", "repo://build_commands"}
+    
+    missing = expected_resources - resource_uris
+    if missing:
+        raise RuntimeError(f"Missing resources: {sorted(missing)}")
+    
+    # Check tools
+    tool_names = {tool.name for tool in asyncio.run(mcp.list_tools())}
+    expected_tools = {
+        "list_extensions",
+        "analyze_extension",
+        "create_extension_template",
+        "run_build",
+        "run_tests",
+        "format_code",
+        "lint_code",
+        "run_preflight",
+        "search_code",
+        "get_extension_dependencies"
+    }
+    
+    missing = expected_tools - tool_names
+    if missing:
+        raise RuntimeError(f"Missing tools: {sorted(missing)}")
     
     print("✅ MCP server functionality test passed")
 
 
 def main():
     """Main test function."""
+    import argparse
+    from concurrent.futures import ThreadPoolExecutor
+    
+    parser = argparse.ArgumentParser(description="Build, install and test the RTX Remix Toolkit MCP Server package")
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Show the output of build and install commands as they run"
+    )
+    args = parser.parse_args()
+    
+    global VERBOSE
+    VERBOSE = args.verbose
+    
     print("🧪 RTX Remix Toolkit MCP Server Package Test")
     print("=" * 50)
     
@@ -178,22 +404,24 @@ def main():
         print("❌ Must run from the toolkit-remix repository root")
         sys.exit(1)
     
-    # Install build dependencies if needed
-    try:
-        import build
-    except ImportError:
+    # Install build dependencies if needed, all in one pip run
+    missing = [package for package in BUILD_REQUIREMENTS if find_spec(package) is None]
+    if missing:
         print("Installing build dependencies...")
-        run_command([sys.executable, "-m", "pip", "install", "build"])
+        run_checked([sys.executable, "-m", "pip", "install", *PIP_INSTALL_FLAGS, *missing])
     
     try:
-        # Test package build
-        wheel_file, tar_file = test_package_build()
-        
-        # Test package installation
-        test_package_install(wheel_file)
-        
-        # Test MCP functionality
-        test_mcp_functionality()
+        # The functionality test only needs the source tree, so run it
+        # while the package builds and installs
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            functionality = executor.submit(test_mcp_functionality)
+            packaged = executor.submit(test_package_build)
+            
+            # Test package installation
+            wheel_file, tar_file = packaged.result()
+            test_package_install(wheel_file)
+            
+            functionality.result()
         
         print("\n🎉 All tests passed!")
         print(f"Package is ready for distribution:")